@@ -0,0 +1,17 @@
+# tests/test_001.py
+
+import unittest
+from tlaloc_commons import commons
+
+class Test(unittest.TestCase):
+
+    def test_000(self):
+        self.assertEqual(
+            commons.get_hash("tlaloc"), commons.get_hash("tlaloc")
+        )
+
+    def test_001(self):
+        self.assertEqual(len(commons.get_hash("tlaloc")), 32)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,24 +1,125 @@
 import time
 import json
-import boto3
 import hashlib
+import logging
 
-from botocore.exceptions import ClientError
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from functools import lru_cache
 
 
-def _object_to_dict(obj, level=0):
-    if level > 10:
+logger = logging.getLogger(__name__)
+
+_scalar_types = (str, int, float, bool, bytes, type(None))
+
+
+def _object_to_dict(obj):
+    if isinstance(obj, _scalar_types):
         return obj
-    elif hasattr(obj, "__dict__"):
-        return {
-            key: _object_to_dict(value, level + 1) for key, value in vars(obj).items()
-        }
-    elif isinstance(obj, list):
-        return [_object_to_dict(item, level + 1) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: _object_to_dict(value, level + 1) for key, value in obj.items()}
-    else:
+
+    # Reusing the conversion cached on the object by a previous call
+    cached = getattr(obj, "_tlaloc_cached_dict", None)
+    if cached is not None:
+        return cached
+
+    # Dataclasses already know how to turn themselves into dicts
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+
+    # Walking the object with an explicit worklist instead of recursion
+    root = [None]
+    visited = set()
+    worklist = deque([(root, 0, obj)])
+    while worklist:
+        parent, key, value = worklist.popleft()
+        if isinstance(value, _scalar_types) or id(value) in visited:
+            parent[key] = value
+        elif hasattr(value, "__dict__"):
+            # Reusing conversions cached on nested objects by earlier calls
+            cached = getattr(value, "_tlaloc_cached_dict", None)
+            if cached is not None:
+                parent[key] = cached
+                continue
+            visited.add(id(value))
+            converted = {}
+            parent[key] = converted
+            for child_key, child in vars(value).items():
+                if child_key == "_tlaloc_cached_dict":
+                    continue
+                worklist.append((converted, child_key, child))
+        elif isinstance(value, list):
+            visited.add(id(value))
+            converted = [None] * len(value)
+            parent[key] = converted
+            for index, child in enumerate(value):
+                worklist.append((converted, index, child))
+        elif isinstance(value, dict):
+            visited.add(id(value))
+            converted = {}
+            parent[key] = converted
+            for child_key, child in value.items():
+                worklist.append((converted, child_key, child))
+        else:
+            parent[key] = value
+
+    # Caching the conversion on objects that can carry attributes
+    result = root[0]
+    if hasattr(obj, "__dict__"):
+        try:
+            obj._tlaloc_cached_dict = result
+        except (AttributeError, TypeError):
+            pass
+    return result
+
+
+@lru_cache(maxsize=None)
+def _cfn_config(max_attempts=10):
+    from botocore.config import Config
+
+    return Config(
+        retries={"mode": "adaptive", "max_attempts": max_attempts},
+        max_pool_connections=20,
+        connect_timeout=5,
+        read_timeout=30,
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_session(profile):
+    import boto3
+
+    return boto3.session.Session(profile_name=profile)
+
+
+@lru_cache(maxsize=None)
+def _get_cfn_client(profile, region, max_attempts=10):
+    return _get_session(profile).client(
+        "cloudformation", region_name=region, config=_cfn_config(max_attempts)
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_sqs_client(profile=None, region=None):
+    return _get_session(profile).client(
+        "sqs", region_name=region, config=_cfn_config()
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_ssm_client(profile=None):
+    return _get_session(profile).client("ssm", config=_cfn_config())
+
+
+def _ensure_dict(obj):
+    if type(obj) is dict:
+
+        # Converting only the nested config when a plain dict wraps a class
+        inner = obj.get("config")
+        if inner is not None and not isinstance(inner, dict):
+            obj = dict(obj)
+            obj["config"] = _object_to_dict(inner)
         return obj
+    return _object_to_dict(obj)
 
 
 class _cloudformation:
@@ -26,66 +127,155 @@ class _cloudformation:
     CloudFormation helper class
 
     Attributes:
-        in_progress_statuses (list): List of in progress statuses
-        successful_statuses (list): List of successful statuses
-        failed_statuses (list): List of failed statuses
-        rollback_statuses (list): List of rollback statuses
-        special_cases (list): List of special cases
+        in_progress_statuses (frozenset): Set of in progress statuses
+        successful_statuses (frozenset): Set of successful statuses
+        failed_statuses (frozenset): Set of failed statuses
+        rollback_statuses (frozenset): Set of rollback statuses
+        special_cases (frozenset): Set of special cases
     """
 
-    in_progress_statuses = [
-        "CREATE_IN_PROGRESS",
-        "ROLLBACK_IN_PROGRESS",
-        "DELETE_IN_PROGRESS",
-        "UPDATE_IN_PROGRESS",
-        "UPDATE_ROLLBACK_IN_PROGRESS",
-        "REVIEW_IN_PROGRESS",
-        "IMPORT_IN_PROGRESS",
-        "IMPORT_ROLLBACK_IN_PROGRESS",
-        "DELETE_IN_PROGRESS",
-        "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
-    ]
+    __slots__ = ("_stack_cache", "_outputs_cache")
+
+    in_progress_statuses = frozenset(
+        {
+            "CREATE_IN_PROGRESS",
+            "ROLLBACK_IN_PROGRESS",
+            "DELETE_IN_PROGRESS",
+            "UPDATE_IN_PROGRESS",
+            "UPDATE_ROLLBACK_IN_PROGRESS",
+            "REVIEW_IN_PROGRESS",
+            "IMPORT_IN_PROGRESS",
+            "IMPORT_ROLLBACK_IN_PROGRESS",
+            "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+        }
+    )
+
+    completed_statuses = frozenset(
+        {
+            "CREATE_COMPLETE",
+            "DELETE_COMPLETE",
+            "UPDATE_COMPLETE",
+            "UPDATE_ROLLBACK_COMPLETE",
+            "IMPORT_COMPLETE",
+            "ROLLBACK_COMPLETE",
+            "IMPORT_ROLLBACK_COMPLETE",
+        }
+    )
+    failed_statuses = frozenset(
+        {
+            "CREATE_FAILED",
+            "ROLLBACK_FAILED",
+            "DELETE_FAILED",
+            "UPDATE_FAILED",
+            "UPDATE_ROLLBACK_FAILED",
+            "IMPORT_FAILED",
+            "IMPORT_ROLLBACK_FAILED",
+        }
+    )
+    rollback_statuses = frozenset(
+        {
+            "ROLLBACK_COMPLETE",
+            "UPDATE_ROLLBACK_COMPLETE",
+            "IMPORT_ROLLBACK_COMPLETE",
+        }
+    )
+    special_cases = frozenset(
+        {
+            "DELETE_IN_PROGRESS",
+            "DELETE_COMPLETE",
+            "DELETE_FAILED",
+        }
+    )
+    update_impossible_statuses = frozenset(
+        {
+            "ROLLBACK_COMPLETE",
+            "ROLLBACK_FAILED",
+            "DELETE_FAILED",
+            "UPDATE_ROLLBACK_FAILED",
+            "IMPORT_ROLLBACK_FAILED",
+        }
+    )
+    status_waiters = {
+        "CREATE_IN_PROGRESS": "stack_create_complete",
+        "UPDATE_IN_PROGRESS": "stack_update_complete",
+        "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS": "stack_update_complete",
+        "DELETE_IN_PROGRESS": "stack_delete_complete",
+        # ROLLBACK_IN_PROGRESS is deliberately absent: the rollback waiter
+        # only accepts UPDATE_ROLLBACK_COMPLETE, so a create rollback ending
+        # in ROLLBACK_COMPLETE would poll until MaxAttempts. That status
+        # falls back to the backoff loop instead.
+        "UPDATE_ROLLBACK_IN_PROGRESS": "stack_rollback_complete",
+        "IMPORT_IN_PROGRESS": "stack_import_complete",
+    }
+
+    stack_cache_ttl = 2
+
+    outputs_cache_ttl = 30
+
+    def __init__(self):
+        self._stack_cache = {}
+        self._outputs_cache = {}
+
+    def _get_client(self, config):
+        """
+        Get a cached CloudFormation client for the profile and region in config
 
-    completed_statuses = [
-        "CREATE_COMPLETE",
-        "DELETE_COMPLETE",
-        "UPDATE_COMPLETE",
-        "UPDATE_ROLLBACK_COMPLETE",
-        "IMPORT_COMPLETE",
-        "DELETE_COMPLETE",
-        "ROLLBACK_COMPLETE",
-        "IMPORT_ROLLBACK_COMPLETE",
-    ]
-    failed_statuses = [
-        "CREATE_FAILED",
-        "ROLLBACK_FAILED",
-        "DELETE_FAILED",
-        "UPDATE_FAILED",
-        "UPDATE_ROLLBACK_FAILED",
-        "IMPORT_FAILED",
-        "IMPORT_ROLLBACK_FAILED",
-        "DELETE_FAILED",
-    ]
-    rollback_statuses = [
-        "ROLLBACK_COMPLETE",
-        "UPDATE_ROLLBACK_COMPLETE",
-        "IMPORT_ROLLBACK_COMPLETE",
-    ]
-    special_cases = [
-        "DELETE_IN_PROGRESS",
-        "DELETE_COMPLETE",
-        "DELETE_FAILED",
-    ]
-    update_impossible_statuses = [
-        "ROLLBACK_COMPLETE",
-        "ROLLBACK_FAILED",
-        "DELETE_FAILED",
-        "UPDATE_ROLLBACK_FAILED",
-        "IMPORT_ROLLBACK_FAILED",
-        "DELETE_FAILED",
-    ]
+        Args:
+            config (dict): builder result holding aws_profile and aws_region
+
+        Returns:
+            client: CloudFormation client for the profile and region
+        """
+        cfg = config["config"]
+        return _get_cfn_client(
+            cfg["aws_profile"], cfg["aws_region"], cfg.get("aws_max_retries", 10)
+        )
+
+    def _create_stack(self, client, config, template_kwargs, common_kwargs):
+        """
+        Create the CloudFormation stack
+
+        Args:
+            client: CloudFormation client to use
+            config (dict): builder result with the aws_stack name
+            template_kwargs (dict): TemplateURL or TemplateBody argument
+            common_kwargs (dict): Capabilities, Parameters and Tags arguments
+
+        Returns:
+            None
+        """
+        cfg = config["config"]
+        logger.info("Creating aws_stack")
+        kwargs = {
+            "StackName": cfg["aws_stack"],
+            **template_kwargs,
+            **common_kwargs,
+        }
+        if "sns_topic_arn" in cfg:
+            kwargs["NotificationARNs"] = [cfg["sns_topic_arn"]]
+        client.create_stack(**kwargs)
+        self._stack_cache.pop(cfg["aws_stack"], None)
 
-    def deploy(self, config, capabilities=[], parameters=[], tags=[]):
+    @staticmethod
+    def _waiter_config(cfg, default_delay=5, default_max=720):
+        """
+        Build a WaiterConfig honouring overrides from the builder config
+
+        Args:
+            cfg (dict): config dict that may hold waiter_delay and
+                waiter_max_attempts
+            default_delay (int): Seconds between polls when not overridden
+            default_max (int): Poll attempts when not overridden
+
+        Returns:
+            dict: WaiterConfig for botocore waiters
+        """
+        return {
+            "Delay": cfg.get("waiter_delay", default_delay),
+            "MaxAttempts": cfg.get("waiter_max_attempts", default_max),
+        }
+
+    def deploy(self, config, capabilities=None, parameters=None, tags=None):
         """
         Deploy the CloudFormation stack
 
@@ -106,202 +296,167 @@ class _cloudformation:
             None
         """
         # Transforming class to dictionary
-        config = _object_to_dict(config)
+        config = _ensure_dict(config)
+        cfg = config["config"]
+
+        # Normalising the optional arguments once for every API call
+        common_kwargs = {
+            "Capabilities": capabilities or [],
+            "Parameters": parameters or [],
+            "Tags": tags or [],
+        }
 
-        # Create the AWS session
-        self._aws_session = boto3.session.Session(
-            profile_name=config["config"]["aws_profile"]
-        )
+        # Get the CloudFormation client
+        client = self._get_client(config)
 
-        # Create the CloudFormation client
-        self._cloudformation_client = self._aws_session.client(
-            "cloudformation", region_name=config["config"]["aws_region"]
-        )
+        # Computing the stack identifiers and S3 template URL once
+        stack_name = cfg["aws_stack"]
+        if "aws_template_file" in cfg:
+            template_url = (
+                f"https://{cfg['aws_bucket']}.s3.{cfg['aws_region']}.amazonaws.com/"
+                f"{cfg['aws_folder']}/{cfg['aws_template_file']}"
+            )
+            template_kwargs = {"TemplateURL": template_url}
+        elif "aws_template_body" in cfg:
+            template_kwargs = {"TemplateBody": cfg["aws_template_body"]}
+        else:
+            raise ValueError("No template provided")
 
         # Check the aws_stack status
-        aws_stack_status = self.check_stack(config["config"]["aws_stack"])
-        print(f"Stack status: {aws_stack_status}")
-
-        if "aws_template_file" in config["config"]:
-            if aws_stack_status == "DOES_NOT_EXIST":
-                print("Creating aws_stack")
-                self._cloudformation_client.create_stack(
-                    StackName=config["config"]["aws_stack"],
-                    TemplateURL=f"https://{config["config"]["aws_bucket"]}.s3.amazonaws.com/{config["config"]["aws_folder"]}/{config["config"]["aws_template_file"]}",
-                    Capabilities=capabilities,
-                    Parameters=parameters,
-                    Tags=tags,
-                )
-            elif aws_stack_status in self.in_progress_statuses:
-                raise ValueError("Stack is in progress")
-            elif (
-                aws_stack_status in self.failed_statuses
-                or aws_stack_status in self.update_impossible_statuses
-            ):
-                print("Handling failed aws_stack")
-                self._cloudformation_client.delete_stack(
-                    StackName=config["config"]["aws_stack"]
-                )
-                self.deploy_wait(config)
-                if self.check_stack(config["config"]["aws_stack"]) != "DOES_NOT_EXIST":
-                    print("Failed to delete stack, cannot continue")
-                    raise ValueError("Failed to delete stack, cannot continue")
-                print("Creating aws_stack")
-                self._cloudformation_client.create_stack(
-                    StackName=config["config"]["aws_stack"],
-                    TemplateURL=f"https://{config["config"]["aws_bucket"]}.s3.amazonaws.com/{config["config"]["aws_folder"]}/{config["config"]["aws_template_file"]}",
-                    Capabilities=capabilities,
-                    Parameters=parameters,
-                    Tags=tags,
+        aws_stack_status = self.check_stack(client, stack_name)
+        logger.info("stack=%s status=%s", stack_name, aws_stack_status)
+
+        if aws_stack_status == "DOES_NOT_EXIST":
+            self._create_stack(client, config, template_kwargs, common_kwargs)
+        elif aws_stack_status in self.in_progress_statuses:
+            raise ValueError("Stack is in progress")
+        elif (
+            aws_stack_status in self.failed_statuses
+            or aws_stack_status in self.update_impossible_statuses
+        ):
+            logger.info("Handling failed aws_stack")
+            client.delete_stack(StackName=stack_name)
+            self._stack_cache.pop(stack_name, None)
+            self.deploy_wait(config)
+            if self.check_stack(client, stack_name) != "DOES_NOT_EXIST":
+                logger.error("Failed to delete stack, cannot continue")
+                raise ValueError("Failed to delete stack, cannot continue")
+            self._create_stack(client, config, template_kwargs, common_kwargs)
+        elif aws_stack_status in self.completed_statuses:
+            change_set_name = f"ChangeSet{cfg['timestamp']}"
+            try:
+                logger.info("Creating change set")
+                change_set = client.create_change_set(
+                    StackName=stack_name,
+                    **template_kwargs,
+                    **common_kwargs,
+                    ChangeSetType="UPDATE",
+                    ChangeSetName=change_set_name,
+                    **(
+                        {"NotificationARNs": [cfg["sns_topic_arn"]]}
+                        if "sns_topic_arn" in cfg
+                        else {}
+                    ),
                 )
-            elif aws_stack_status in self.completed_statuses:
-                try:
-                    print("Creating change set")
-                    change_set = self._cloudformation_client.create_change_set(
-                        StackName=config["config"]["aws_stack"],
-                        TemplateURL=f"https://{config["config"]["aws_bucket"]}.s3.amazonaws.com/{config["config"]["aws_folder"]}/{config["config"]["aws_template_file"]}",
-                        Capabilities=capabilities,
-                        Parameters=parameters,
-                        Tags=tags,
-                        ChangeSetType="UPDATE",
-                        ChangeSetName=f"ChangeSet{config['config']['timestamp']}",
+                # Polling until the change set settles so no-op updates are
+                # detected consistently rather than by luck of timing
+                logger.info("Waiting for change set to be created")
+                for _ in range(10):
+                    change_set_description = client.describe_change_set(
+                        StackName=stack_name,
+                        ChangeSetName=change_set_name,
                     )
-                    change_set_description = (
-                        self._cloudformation_client.describe_change_set(
-                            StackName=config["config"]["aws_stack"],
-                            ChangeSetName=f"ChangeSet{config['config']['timestamp']}",
+                    if change_set_description["Status"] in (
+                        "CREATE_COMPLETE",
+                        "FAILED",
+                    ):
+                        break
+                    time.sleep(3)
+                if change_set_description["Status"] == "FAILED":
+                    status_reason = change_set_description.get("StatusReason", "")
+                    if (
+                        "didn't contain changes" in status_reason
+                        or "No updates" in status_reason
+                    ):
+                        logger.info("No updates detected. Skipping stack update.")
+                        client.delete_change_set(
+                            StackName=stack_name,
+                            ChangeSetName=change_set_name,
                         )
-                    )
-                    if change_set_description["Status"] == "FAILED":
-                        if (
-                            change_set_description["StatusReason"]
-                            == "The submitted information didn't contain changes. Submit different information to create a change set."
-                        ):
-                            print("No updates detected. Skipping stack update.")
-                            self._cloudformation_client.delete_change_set(
-                                StackName=config["config"]["aws_stack"],
-                                ChangeSetName=f"ChangeSet{config['config']['timestamp']}",
-                            )
-                            return
-                        else:
-                            raise ValueError(
-                                f"Failed to create change set: {change_set_description['StatusReason']}"
-                            )
-                    print("Waiting for change set to be created")
-                    waiter = self._cloudformation_client.get_waiter(
-                        "change_set_create_complete"
-                    )
+                        return
+                    else:
+                        raise ValueError(
+                            f"Failed to create change set: {status_reason}"
+                        )
+                elif change_set_description["Status"] != "CREATE_COMPLETE":
+                    waiter = client.get_waiter("change_set_create_complete")
                     waiter.wait(
                         ChangeSetName=change_set["Id"],
-                        WaiterConfig={
-                            "Delay": 10,
-                            "MaxAttempts": 30,
-                        },
-                    )
-                    print("Executing change set")
-                    self._cloudformation_client.execute_change_set(
-                        StackName=config["config"]["aws_stack"],
-                        ChangeSetName=f"ChangeSet{config['config']['timestamp']}",
+                        WaiterConfig=self._waiter_config(cfg, 5, 120),
                     )
-                    print("Waiting for stack to be updated")
-                    waiter = self._cloudformation_client.get_waiter(
-                        "stack_update_complete"
-                    )
-                    waiter.wait(
-                        StackName=config["config"]["aws_stack"],
-                        WaiterConfig={
-                            "Delay": 10,
-                            "MaxAttempts": 30,
-                        },
-                    )
-                    stack_status = self.check_stack(config["config"]["aws_stack"])
-                    print(f"Stack status: {stack_status}")
-                except Exception as e:
-                    if "No updates are to be performed" in str(e):
-                        print("No updates detected. Skipping stack update.")
-                    else:
-                        raise
-        elif "aws_template_body" in config["config"]:
-            if aws_stack_status == "DOES_NOT_EXIST":
-                print("Creating aws_stack")
-                self._cloudformation_client.create_stack(
-                    StackName=config["config"]["aws_stack"],
-                    TemplateURL=f"https://{config["config"]["aws_bucket"]}.s3.amazonaws.com/{config["config"]["aws_folder"]}/{config["config"]["aws_template_file"]}",
-                    Capabilities=capabilities,
-                    Parameters=parameters,
-                    Tags=tags,
-                )
-            elif aws_stack_status in self.in_progress_statuses:
-                raise ValueError("Stack is in progress")
-            elif aws_stack_status in self.failed_statuses:
-                print("Handling failed aws_stack")
-                self._cloudformation_client.delete_stack(
-                    StackName=config["config"]["aws_stack"]
+                logger.info("Executing change set")
+                client.execute_change_set(
+                    StackName=stack_name,
+                    ChangeSetName=change_set_name,
                 )
-                self.deploy_wait(config)
-                if self.check_stack(config["config"]["aws_stack"]) != "DOES_NOT_EXIST":
-                    print("Failed to delete stack, cannot continue")
-                    raise ValueError("Failed to delete stack, cannot continue")
-                print("Creating aws_stack")
-                self._cloudformation_client.create_stack(
-                    StackName=config["config"]["aws_stack"],
-                    TemplateURL=f"https://{config["config"]["aws_bucket"]}.s3.amazonaws.com/{config["config"]["aws_folder"]}/{config["config"]["aws_template_file"]}",
-                    Capabilities=capabilities,
-                    Parameters=parameters,
-                    Tags=tags,
+                self._stack_cache.pop(stack_name, None)
+                logger.info("Waiting for stack to be updated")
+                waiter = client.get_waiter("stack_update_complete")
+                waiter.wait(
+                    StackName=stack_name,
+                    WaiterConfig=self._waiter_config(cfg),
                 )
-            elif aws_stack_status in self.completed_statuses:
-                try:
-                    print("Creating change set")
-                    change_set = self._cloudformation_client.create_change_set(
-                        StackName=config["config"]["aws_stack"],
-                        TemplateBody=config["config"]["aws_template_body"],
-                        Capabilities=capabilities,
-                        Parameters=parameters,
-                        Tags=tags,
-                        ChangeSetType="UPDATE",
-                        ChangeSetName=f"{config['config']['timestamp']}-change-set",
-                    )
-                    print("Waiting for change set to be created")
-                    waiter = self._cloudformation_client.get_waiter(
-                        "change_set_create_complete"
-                    )
-                    waiter.wait(
-                        ChangeSetName=change_set["Id"],
-                        WaiterConfig={
-                            "Delay": 10,
-                            "MaxAttempts": 30,
-                        },
-                    )
-                    print("Executing change set")
-                    self._cloudformation_client.execute_change_set(
-                        ChangeSetName=f"{config['config']['timestamp']}-change-set",
-                    )
-                    print("Waiting for stack to be updated")
-                    waiter = self._cloudformation_client.get_waiter(
-                        "stack_update_complete"
-                    )
-                    waiter.wait(
-                        StackName=config["config"]["aws_stack"],
-                        WaiterConfig={
-                            "Delay": 10,
-                            "MaxAttempts": 30,
-                        },
-                    )
-                    stack_status = self.check_stack(config["config"]["aws_stack"])
-                    print(f"Stack status: {stack_status}")
-                except Exception as e:
-                    if "No updates are to be performed" in str(e):
-                        print("No updates detected. Skipping stack update.")
-                    else:
-                        raise
-        else:
-            raise ValueError("No template provided")
+                stack_status = self.check_stack(client, stack_name)
+                logger.info("stack=%s status=%s", stack_name, stack_status)
+            except Exception as e:
+                error = getattr(e, "response", {}).get("Error", {})
+                if (
+                    error.get("Code") == "ValidationError"
+                    and "No updates are to be performed" in error.get("Message", "")
+                ):
+                    logger.info("No updates detected. Skipping stack update.")
+                else:
+                    raise
+
+    def deploy_many(
+        self, configs, capabilities=None, parameters=None, tags=None, max_workers=10
+    ):
+        """
+        Deploy several independent CloudFormation stacks in parallel
+
+        Stack deployments are I/O bound and boto3 clients are thread safe,
+        so independent stacks fan out onto a thread pool. Stacks that
+        depend on each other must be passed in separate calls.
 
-        # Close the CloudFormation client
-        self._cloudformation_client.close()
+        Args:
+            configs (list): builder results, one per stack
+            capabilities (list): Capabilities passed to CloudFormation
+            parameters (list): Parameters passed to CloudFormation
+            tags (list): Tags passed to CloudFormation
+            max_workers (int): Maximum number of concurrent deployments
 
-        del self._aws_session
+        Raises:
+            Exception: The first error raised by a deployment, after all
+                deployments have finished
+
+        Returns:
+            None
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.deploy, config, capabilities, parameters, tags)
+                for config in configs
+            ]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+        if errors:
+            raise errors[0]
 
     def get_output(self, user, output_name):
         """
@@ -314,131 +469,276 @@ class _cloudformation:
             dict: Outputs of the CloudFormation stack
         """
 
-        # Create the AWS session
-        self._aws_session = boto3.session.Session(
-            profile_name=user["config"]["aws_profile"]
-        )
+        from botocore.exceptions import ClientError
 
-        # Create the CloudFormation client
-        self._cloudformation_client = self._aws_session.client(
-            "cloudformation", region_name=user["config"]["aws_region"]
-        )
+        # Reusing recently retrieved outputs for the stack
+        name = user["config"]["aws_stack"]
+        cached = self._outputs_cache.get(name)
+        if cached is not None and time.time() - cached[0] < self.outputs_cache_ttl:
+            outputs_by_key = cached[1]
+        else:
 
-        # Looking up the stack
-        value = None
-        status = "DOES_NOT_EXIST"
-        while True:
+            # Get the CloudFormation client
+            client = self._get_client(user)
+
+            # Retrieve the stack status and outputs in a single call,
+            # polling a bounded number of times while the stack settles
+            for attempt in range(60):
+                try:
+                    response = client.describe_stacks(StackName=name)
+                    stack = response.get("Stacks")[0]
+                    status = stack.get("StackStatus")
+                except ClientError as e:
+                    error = e.response["Error"]
+                    if (
+                        error["Code"] == "ValidationError"
+                        and "does not exist" in error["Message"]
+                    ):
+                        status = "DOES_NOT_EXIST"
+                    else:
+                        raise
+                if status not in self.in_progress_statuses:
+                    break
+                time.sleep(5)
+            logger.info("stack=%s status=%s", name, status)
 
-            # Check the stack status
-            status = self.check_stack(user["config"]["aws_stack"])
-            print(f"Stack status: {status}")
             if (
                 status == "DOES_NOT_EXIST"
-                or status not in self.completed_statuses
                 or status in self.failed_statuses
+                or status not in self.completed_statuses
             ):
-                break
+                raise ValueError(f"Stack is not in a valid state: {status}")
 
-            # Retrieve the stack outputs
-            response = self._cloudformation_client.describe_stacks(
-                StackName=user["config"]["aws_stack"]
-            )
-            outputs = response.get("Stacks")[0].get("Outputs")
-
-            # Find the value of the output
-            while True:
-                for output in outputs:
-                    if output["OutputKey"] == output_name:
-                        value = output["OutputValue"]
-                        break
-                break
-            break
+            # Build the outputs lookup once per stack
+            outputs_by_key = {
+                output["OutputKey"]: output["OutputValue"]
+                for output in stack.get("Outputs") or []
+            }
+            self._outputs_cache[name] = (time.time(), outputs_by_key)
 
-        # Close the CloudFormation client
-        self._cloudformation_client.close()
-
-        # Delete the session
-        del self._aws_session
-
-        if (
-            status == "DOES_NOT_EXIST"
-            or status in self.failed_statuses
-            or status not in self.completed_statuses
-        ):
-            raise ValueError(f"Stack is not in a valid state: {status}")
+        # Find the value of the output
+        value = outputs_by_key.get(output_name)
 
         if value is None:
             raise ValueError(f"Output {output_name} not found")
 
         return value
 
-    def deploy_wait(self, user, timeout=600):
+    def _describe_all_stacks(self, client):
+        """
+        Describe every stack visible to the client with one paginated call
 
-        # Transforming class to dictionary
-        user = _object_to_dict(user)
+        Args:
+            client: CloudFormation client to use
 
-        # Create session
-        self._aws_session_wait = boto3.session.Session(
-            profile_name=user["config"]["aws_profile"]
-        )
+        Returns:
+            dict: Stack statuses keyed by stack name
+        """
+        paginator = client.get_paginator("describe_stacks")
+        statuses = {}
+        now = time.time()
+        for page in paginator.paginate():
+            for stack in page["Stacks"]:
+                statuses[stack["StackName"]] = stack["StackStatus"]
+                self._stack_cache[stack["StackName"]] = (now, stack["StackStatus"])
+        return statuses
+
+    def deploy_wait_many(self, configs, timeout=600):
+        """
+        Wait for several stacks with one DescribeStacks per poll cycle
 
-        # Create client
-        self._cloudformation_client = self._aws_session_wait.client(
-            "cloudformation", region_name=user["config"]["aws_region"]
-        )
+        All configs must share the same profile and region; each poll
+        issues a single paginated describe instead of one call per stack.
 
-        while True:
+        Args:
+            configs (list): builder results, one per stack
+            timeout (int): Maximum seconds to wait
 
-            # Checking that the stack exists
-            status = self.check_stack(user["config"]["aws_stack"])
-            if status == "DOES_NOT_EXIST":
-                print("The stack does not exist")
+        Returns:
+            dict: Final stack statuses keyed by stack name, with
+                "DOES_NOT_EXIST" for stacks that were not found
+        """
+        configs = [_ensure_dict(config) for config in configs]
+        if not configs:
+            return {}
+        client = self._get_client(configs[0])
+        names = [config["config"]["aws_stack"] for config in configs]
+
+        # Polling all stacks at once with bounded backoff
+        start_time = time.time()
+        delay = 2
+        while True:
+            statuses = self._describe_all_stacks(client)
+            pending = [
+                name for name in names if statuses.get(name) in self.in_progress_statuses
+            ]
+            if not pending or time.time() - start_time >= timeout:
                 break
+            time.sleep(delay)
+            delay = min(delay * 1.5, 30)
 
-            # Iterating while ongoing or timeout
-            start_time = time.time()
-            while (
-                status in self.in_progress_statuses
-                and time.time() - start_time < timeout
-            ):
-                time.sleep(10)
-                status = self.check_stack(user["config"]["aws_stack"])
-
-            # Reporting the status
-            if status in self.completed_statuses or status == "DOES_NOT_EXIST":
-                print("Stack procedure successful")
-            elif status in self.failed_statuses:
-                print("Stack procedure failed")
+        # Reporting the statuses
+        final = {name: statuses.get(name, "DOES_NOT_EXIST") for name in names}
+        for name, status in final.items():
+            logger.info("stack=%s status=%s", name, status)
+        return final
+
+    def _wait_via_sqs(self, user, queue_url, timeout=600):
+        """
+        Wait for a terminal stack status via CloudFormation SNS notifications
+
+        Long-polls the SQS queue subscribed to the stack's SNS topic
+        instead of polling DescribeStacks, cutting the CloudFormation API
+        traffic of a wait to a single describe call.
+
+        Args:
+            user (dict): builder result with aws_profile and aws_stack
+            queue_url (str): URL of the SQS queue receiving stack events
+            timeout (int): Maximum seconds to wait
+
+        Returns:
+            str: Terminal stack status, or None if the timeout elapsed
+        """
+        sqs = _get_sqs_client(
+            user["config"]["aws_profile"], user["config"]["aws_region"]
+        )
+        stack_name = user["config"]["aws_stack"]
+        terminal_statuses = self.completed_statuses | self.failed_statuses
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = sqs.receive_message(
+                QueueUrl=queue_url,
+                WaitTimeSeconds=20,
+                MaxNumberOfMessages=10,
+            )
+            for message in response.get("Messages", []):
+                body = message["Body"]
+                try:
+                    body = json.loads(body).get("Message", body)
+                except ValueError:
+                    pass
+                fields = {}
+                for line in body.splitlines():
+                    field_key, separator, field_value = line.partition("=")
+                    if separator:
+                        fields[field_key] = field_value.strip("'")
+                sqs.delete_message(
+                    QueueUrl=queue_url,
+                    ReceiptHandle=message["ReceiptHandle"],
+                )
+                if (
+                    fields.get("ResourceType") == "AWS::CloudFormation::Stack"
+                    and fields.get("StackName") == stack_name
+                    and fields.get("ResourceStatus") in terminal_statuses
+                ):
+                    return fields["ResourceStatus"]
+        return None
+
+    def deploy_wait(self, user, timeout=600):
+        from botocore.exceptions import WaiterError
+
+        # Transforming class to dictionary
+        user = _ensure_dict(user)
+
+        # Get the CloudFormation client
+        client = self._get_client(user)
+
+        # Checking that the stack exists
+        status = self.check_stack(client, user["config"]["aws_stack"])
+        if status == "DOES_NOT_EXIST":
+            logger.info("The stack does not exist")
+            return
+
+        # Waiting while ongoing or timeout
+        if status in self.in_progress_statuses:
+            waiter_name = self.status_waiters.get(status)
+            if "sqs_queue_url" in user["config"]:
+                self._wait_via_sqs(user, user["config"]["sqs_queue_url"], timeout)
+            elif waiter_name is not None:
+                try:
+                    waiter = client.get_waiter(waiter_name)
+                    waiter.wait(
+                        StackName=user["config"]["aws_stack"],
+                        WaiterConfig={
+                            "Delay": 5,
+                            "MaxAttempts": max(timeout // 5, 1),
+                        },
+                    )
+                except WaiterError:
+                    pass
             else:
-                print("Stack procedure timed out")
-            print(f"Stack status: {status}")
-            break
+                start_time = time.time()
+                delay = 2
+                while (
+                    status in self.in_progress_statuses
+                    and time.time() - start_time < timeout
+                ):
+                    time.sleep(delay)
+                    previous_status = status
+                    status = self.check_stack(client, user["config"]["aws_stack"])
+                    if status != previous_status:
+                        delay = 2
+                    else:
+                        delay = min(delay * 1.5, 30)
+            status = self.check_stack(client, user["config"]["aws_stack"])
+
+        # Reporting the status
+        if status in self.completed_statuses or status == "DOES_NOT_EXIST":
+            logger.info("Stack procedure successful")
+        elif status in self.failed_statuses:
+            logger.error("Stack procedure failed")
+        else:
+            logger.warning("Stack procedure timed out")
+        logger.info("stack=%s status=%s", user["config"]["aws_stack"], status)
+
+    async def deploy_wait_async(self, user, timeout=600):
+        """
+        Wait for the CloudFormation stack without blocking the event loop
 
-        # Closing the client
-        self._cloudformation_client.close()
+        Delegates to the aioboto3-backed helper in commons_async; multiple
+        stacks can be awaited concurrently on one event loop.
 
-        # Deleting the session
-        del self._aws_session_wait
+        Args:
+            user (dict): builder result with aws_profile, aws_region and aws_stack
+            timeout (int): Maximum seconds to wait for in progress stacks
 
-    def check_stack(self, name):
+        Returns:
+            None
+        """
+        from .commons_async import cloudformation_async
+
+        await cloudformation_async.deploy_wait(user, timeout)
+
+    def check_stack(self, client, name):
         """
         Check the status of the CloudFormation stack
 
         Args:
+            client: CloudFormation client to use
             name (str): Name of the CloudFormation stack
 
         Returns:
             str: Status of the CloudFormation stack or "DOES_NOT_EXIST" if the stack does not exist
         """
 
+        from botocore.exceptions import ClientError
+
+        # Reusing a recent status to avoid redundant DescribeStacks calls
+        cached = self._stack_cache.get(name)
+        if cached is not None and time.time() - cached[0] < self.stack_cache_ttl:
+            return cached[1]
+
         try:
-            response = self._cloudformation_client.describe_stacks(StackName=name)
-            return response.get("Stacks")[0].get("StackStatus")
+            response = client.describe_stacks(StackName=name)
+            status = response.get("Stacks")[0].get("StackStatus")
         except ClientError as e:
-            if "does not exist" in str(e):
-                return "DOES_NOT_EXIST"
+            error = e.response["Error"]
+            if error["Code"] == "ValidationError" and "does not exist" in error["Message"]:
+                status = "DOES_NOT_EXIST"
             else:
                 raise
+        self._stack_cache[name] = (time.time(), status)
+        return status
 
 
 class _ssm:
@@ -460,17 +760,43 @@ class _ssm:
             str: Value of the SSM parameter
         """
 
-        # Create the SSM client
-        self._ssm_client = boto3.client("ssm")
+        # Get the cached SSM client
+        client = _get_ssm_client()
 
         # Get the parameter
-        response = self._ssm_client.get_parameter(Name=name)
-
-        # Close the SSM client
-        self._ssm_client.close()
+        response = client.get_parameter(Name=name)
 
         return response["Parameter"]["Value"]
 
+    def get_parameters(self, names):
+        """
+        Get the values of several SSM parameters with batched calls
+
+        SSM accepts up to ten names per GetParameters request, so N
+        parameters cost ceil(N / 10) API calls instead of N.
+
+        Args:
+            names (list): Names of the SSM parameters
+
+        Returns:
+            dict: Parameter values keyed by parameter name
+        """
+
+        # Get the cached SSM client
+        client = _get_ssm_client()
+
+        # Get the parameters in chunks of ten
+        values = {}
+        for index in range(0, len(names), 10):
+            response = client.get_parameters(Names=list(names[index : index + 10]))
+            values.update(
+                {
+                    parameter["Name"]: parameter["Value"]
+                    for parameter in response["Parameters"]
+                }
+            )
+        return values
+
 
 class _aws:
     """
@@ -479,8 +805,12 @@ class _aws:
     Attributes:
         cloudformation (cloudformation): CloudFormation helper class
         regions (list): List of valid AWS regions
+        regions_set (frozenset): Set of valid AWS regions for membership checks
+        regions_sorted (tuple): Sorted tuple of valid AWS regions for iteration
     """
 
+    __slots__ = ()
+
     cloudformation = _cloudformation()
 
     ssm = _ssm()
@@ -509,6 +839,10 @@ class _aws:
         "sa-east-1",
     ]
 
+    regions_set = frozenset(regions)
+
+    regions_sorted = tuple(sorted(regions_set))
+
 
 class commons:
     """
@@ -516,12 +850,16 @@ class commons:
 
     Attributes:
         http_methods (list): List of HTTP methods
+        http_methods_set (frozenset): Set of HTTP methods for membership checks
+        http_methods_sorted (tuple): Sorted tuple of HTTP methods for iteration
         aws(_aws): AWS helper class
 
     Returns:
         None
     """
 
+    __slots__ = ()
+
     http_methods = [
         "GET",
         "POST",
@@ -533,16 +871,22 @@ class commons:
         "ANY",
     ]
 
+    http_methods_set = frozenset(http_methods)
+
+    http_methods_sorted = tuple(sorted(http_methods_set))
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
     def get_hash(string):
         """
-        Get the MD5 hash of a string
+        Get the 128 bit BLAKE2b hash of a string
 
         Args:
             string (str): String to be hashed
 
         Returns:
-            str: MD5 hash of the string
+            str: 32 character hex hash of the string
         """
-        return hashlib.md5(string.encode("utf-8")).hexdigest()
+        return hashlib.blake2b(string.encode("utf-8"), digest_size=16).digest().hex()
 
     aws = _aws()
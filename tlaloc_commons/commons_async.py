@@ -0,0 +1,186 @@
+import time
+import asyncio
+import logging
+
+from .commons import _cloudformation, _ensure_dict
+
+
+logger = logging.getLogger(__name__)
+
+
+class _cloudformation_async:
+    """
+    Async CloudFormation helper class
+
+    Mirrors the wait behaviour of _cloudformation on aioboto3 so a single
+    event loop can watch many stacks concurrently instead of one thread
+    per stack. Requires the optional aioboto3 dependency, imported on
+    first use.
+
+    Attributes:
+        in_progress_statuses (frozenset): Set of in progress statuses
+        completed_statuses (frozenset): Set of completed statuses
+        failed_statuses (frozenset): Set of failed statuses
+        status_waiters (dict): Waiter names keyed by in progress status
+    """
+
+    in_progress_statuses = _cloudformation.in_progress_statuses
+    completed_statuses = _cloudformation.completed_statuses
+    failed_statuses = _cloudformation.failed_statuses
+    status_waiters = _cloudformation.status_waiters
+
+    def __init__(self, max_concurrent=10):
+        self._max_concurrent = max_concurrent
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self):
+        """
+        Get the concurrency semaphore for the running event loop
+
+        A semaphore binds to the loop it was first awaited on, so the
+        module-level instance recreates it whenever asyncio.run starts a
+        fresh loop instead of keeping one from __init__.
+
+        Returns:
+            asyncio.Semaphore: Semaphore bound to the running loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    @staticmethod
+    def _get_session(user):
+        import aioboto3
+
+        return aioboto3.Session(profile_name=user["config"]["aws_profile"])
+
+    async def check_stack(self, client, name):
+        """
+        Check the status of the CloudFormation stack
+
+        Args:
+            client: Async CloudFormation client to use
+            name (str): Name of the CloudFormation stack
+
+        Returns:
+            str: Status of the CloudFormation stack or "DOES_NOT_EXIST" if the stack does not exist
+        """
+        from botocore.exceptions import ClientError
+
+        async with self._get_semaphore():
+            try:
+                response = await client.describe_stacks(StackName=name)
+                return response.get("Stacks")[0].get("StackStatus")
+            except ClientError as e:
+                error = e.response["Error"]
+                if (
+                    error["Code"] == "ValidationError"
+                    and "does not exist" in error["Message"]
+                ):
+                    return "DOES_NOT_EXIST"
+                else:
+                    raise
+
+    async def deploy_wait(self, user, timeout=600):
+        """
+        Wait for the CloudFormation stack without blocking the event loop
+
+        Args:
+            user (dict): builder result with aws_profile, aws_region and aws_stack
+            timeout (int): Maximum seconds to wait for in progress stacks
+
+        Returns:
+            None
+        """
+        from botocore.exceptions import WaiterError
+
+        # Transforming class to dictionary
+        user = _ensure_dict(user)
+
+        # Create the async session and client
+        session = self._get_session(user)
+        async with session.client(
+            "cloudformation", region_name=user["config"]["aws_region"]
+        ) as client:
+
+            # Checking that the stack exists
+            status = await self.check_stack(client, user["config"]["aws_stack"])
+            if status == "DOES_NOT_EXIST":
+                logger.info("The stack does not exist")
+                return
+
+            # Waiting while ongoing or timeout
+            if status in self.in_progress_statuses:
+                waiter_name = self.status_waiters.get(status)
+                if waiter_name is not None:
+                    try:
+                        waiter = client.get_waiter(waiter_name)
+                        await waiter.wait(
+                            StackName=user["config"]["aws_stack"],
+                            WaiterConfig={
+                                "Delay": 5,
+                                "MaxAttempts": max(timeout // 5, 1),
+                            },
+                        )
+                    except WaiterError:
+                        pass
+                else:
+                    start_time = time.time()
+                    delay = 2
+                    while (
+                        status in self.in_progress_statuses
+                        and time.time() - start_time < timeout
+                    ):
+                        await asyncio.sleep(delay)
+                        previous_status = status
+                        status = await self.check_stack(
+                            client, user["config"]["aws_stack"]
+                        )
+                        if status != previous_status:
+                            delay = 2
+                        else:
+                            delay = min(delay * 1.5, 30)
+                status = await self.check_stack(client, user["config"]["aws_stack"])
+
+            # Reporting the status
+            if status in self.completed_statuses or status == "DOES_NOT_EXIST":
+                logger.info("Stack procedure successful")
+            elif status in self.failed_statuses:
+                logger.error("Stack procedure failed")
+            else:
+                logger.warning("Stack procedure timed out")
+            logger.info(
+                "stack=%s status=%s", user["config"]["aws_stack"], status
+            )
+
+    async def deploy_wait_many(self, users, timeout=600):
+        """
+        Wait for several CloudFormation stacks concurrently
+
+        Args:
+            users (list): builder results, one per stack
+            timeout (int): Maximum seconds to wait per stack
+
+        Returns:
+            None
+        """
+        await asyncio.gather(*(self.deploy_wait(user, timeout) for user in users))
+
+    def deploy_wait_many_sync(self, users, timeout=600):
+        """
+        Synchronous wrapper around deploy_wait_many
+
+        Args:
+            users (list): builder results, one per stack
+            timeout (int): Maximum seconds to wait per stack
+
+        Returns:
+            None
+        """
+        asyncio.run(self.deploy_wait_many(users, timeout))
+
+
+cloudformation_async = _cloudformation_async()